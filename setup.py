@@ -7,11 +7,14 @@ setup(
     include_package_data=True,
     install_requires=[
         'nba_api>=1.2.1',
-        'polars>=0.20.2',
+        'polars>=1.7,<2',
         'streamlit>=1.29.0',
+        'streamlit-autorefresh>=1.0.1',
         'scikit-learn>=1.3.0',
         'plotly>=5.18.0',
+        'plotly-resampler>=0.9.1',
         'pyyaml>=6.0.1',
+        'orjson>=3.9.10',
         'joblib>=1.3.2',
     ],
 )
\ No newline at end of file
@@ -2,9 +2,17 @@ import streamlit as st
 import polars as pl
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly_resampler import FigureResampler
+from streamlit_autorefresh import st_autorefresh
 from datetime import datetime, timedelta
 import time
-from typing import Optional
+import random
+import threading
+import concurrent.futures
+import statistics
+from collections import deque
+from typing import List, Optional
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
 from src.data.nba_data import RaptorsDataManager
 from src.models.predictor import RaptorsPredictor
@@ -15,12 +23,31 @@ from src.utils.cache import RedisCache
 config = Config()
 cache = RedisCache()
 
+# Resolved once at import; chart builders run on every rerun
+_COLORS = config.chart_colors
+_PRIMARY = _COLORS["primary"]
+_SECONDARY = _COLORS["secondary"]
+
+MAX_PIE_SLICES = 50
+
+
+def _hash_frame(df: pl.DataFrame) -> tuple:
+    """Cheap content hash so cached chart builders can be keyed on a DataFrame"""
+    return df.shape, str(df.schema), df.hash_rows().sum()
+
+
+_FRAME_HASH_FUNCS = {pl.DataFrame: _hash_frame}
+
 
 # Cache data loading functions
 @st.cache_data(ttl=3600)
 def load_team_games(_data_manager: RaptorsDataManager, season: Optional[str] = None) -> Optional[pl.DataFrame]:
     """Load team games with caching"""
-    return _data_manager.get_team_games(season)
+    games_df = _data_manager.get_team_games(season)
+    if games_df is None:
+        return None
+    # Datetime[ms] exports to numpy without a copy (Date does not), so charts reuse the buffer
+    return games_df.with_columns(pl.col("GAME_DATE").cast(pl.Datetime("ms")))
 
 
 @st.cache_data(ttl=3600)
@@ -29,40 +56,102 @@ def load_player_stats(_data_manager: RaptorsDataManager, season: Optional[str] =
     return _data_manager.get_player_stats(season)
 
 
+@st.cache_data(ttl=3600)
+def load_player_averages(_data_manager: RaptorsDataManager, season: Optional[str] = None) -> Optional[pl.DataFrame]:
+    """Load per-player season averages with caching"""
+    player_stats = load_player_stats(_data_manager, season)
+    if player_stats is None:
+        return None
+
+    # Filter first so the optimizer runs the group_by on the selected season only
+    player_lf = player_stats.lazy()
+    if season:
+        player_lf = player_lf.filter(pl.col("SEASON") == season)
+
+    return (player_lf
+            .group_by(["SEASON", "PLAYER_NAME"], maintain_order=False)
+            .agg([
+        pl.col(["PTS", "REB", "AST"]).mean().name.prefix("AVG_"),
+        pl.col("FG_PCT").mean(),
+        pl.col("PTS").count().alias("GAMES_PLAYED")
+    ])
+            # Round the per-player results once, after aggregation
+            .with_columns([
+        pl.col("^AVG_.*$").round(1),
+        pl.col("FG_PCT").round(3)
+    ])
+            .sort(["SEASON", "AVG_PTS"], descending=[True, True])
+            .collect()
+            )
+
+
+@st.cache_data(ttl=3600)
+def load_player_names(_data_manager: RaptorsDataManager, season: Optional[str] = None) -> List[str]:
+    """Load the sorted player names for the comparison selectboxes"""
+    player_stats = load_player_stats(_data_manager, season)
+    if player_stats is None:
+        return []
+    return player_stats.get_column("PLAYER_NAME").unique().sort().to_list()
+
+
+@st.cache_data(ttl=3600)
+def load_player_radar_stats(_data_manager: RaptorsDataManager,
+                            season: Optional[str] = None) -> Optional[pl.DataFrame]:
+    """Load only the columns the player comparison radar aggregates"""
+    player_stats = load_player_stats(_data_manager, season)
+    if player_stats is None:
+        return None
+    return player_stats.select(["PLAYER_NAME", "PTS", "REB", "AST", "FG_PCT", "STL", "BLK"])
+
+
+@st.cache_resource
+def get_predictor() -> RaptorsPredictor:
+    """Share one predictor across reruns so its loaded model stays in memory"""
+    return RaptorsPredictor()
+
+
+def timed_load(name: str, loader, *args):
+    """Call a cached loader and record its latency for the sidebar cache stats"""
+    start = time.perf_counter()
+    result = loader(*args)
+    timings = st.session_state.setdefault("cache_timings", {})
+    timings.setdefault(name, deque(maxlen=100)).append(time.perf_counter() - start)
+    return result
+
+
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
 def create_team_stats_chart(df: pl.DataFrame, season: str = None) -> go.Figure:
     """Create an interactive team statistics chart"""
     if df is None:
         return None
 
-    colors = config.chart_colors
-
     if season:
         df = df.filter(pl.col("SEASON") == season)
 
+    # Only the date and points columns feed the traces; the trailing average needs oldest-first order
+    df = df.select(["GAME_DATE", "PTS"]).sort("GAME_DATE")
+
     # Prepare data once
     dates = df["GAME_DATE"].to_numpy()
     points = df["PTS"].to_numpy()
     moving_avg = df["PTS"].rolling_mean(window_size=5).to_numpy()
 
-    fig = go.Figure()
+    # Downsample long (multi-season) traces with MinMax-LTTB so at most max_points reach the browser
+    fig = FigureResampler(go.Figure(), default_n_shown_samples=config.chart_max_points)
 
     # Add points line
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=points,
+    fig.add_trace(go.Scattergl(
         name="Points",
-        line=dict(color=colors["primary"], width=2),
+        line=dict(color=_PRIMARY, width=2),
         mode="lines+markers"
-    ))
+    ), hf_x=dates, hf_y=points)
 
     # Add moving average
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=moving_avg,
+    fig.add_trace(go.Scattergl(
         name="5-Game Average",
-        line=dict(color=colors["secondary"], width=2, dash="dash"),
+        line=dict(color=_SECONDARY, width=2, dash="dash"),
         mode="lines"
-    ))
+    ), hf_x=dates, hf_y=moving_avg)
 
     title = "Raptors Scoring Trend"
     if season:
@@ -79,30 +168,40 @@ def create_team_stats_chart(df: pl.DataFrame, season: str = None) -> go.Figure:
     return fig
 
 
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
 def create_win_loss_pie_chart(games_df: pl.DataFrame) -> go.Figure:
     """Create a pie chart for win-loss ratio"""
     if games_df is None:
         return None
 
-    win_loss_counts = games_df.group_by("WL").count()
+    win_loss_counts = games_df["WL"].value_counts(sort=True)
 
-    fig = go.Figure(data=[go.Pie(labels=win_loss_counts["WL"], values=win_loss_counts["count"])])
+    # Pie charts stop being readable (and render slowly) past a few dozen slices
+    if len(win_loss_counts) > MAX_PIE_SLICES:
+        fig = px.bar(x=win_loss_counts["WL"].to_numpy(), y=win_loss_counts["count"].to_numpy(),
+                     labels=dict(x="WL", y="count"))
+    else:
+        # Counts are already sorted, so skip plotly.js's own sort pass
+        fig = go.Figure(data=[go.Pie(labels=win_loss_counts["WL"], values=win_loss_counts["count"], sort=False)])
     fig.update_layout(title="Win-Loss Ratio")
 
     return fig
 
 
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
 def create_shooting_efficiency_heatmap(games_df: pl.DataFrame) -> go.Figure:
     """Create a heatmap for shooting efficiency"""
     if games_df is None:
         return None
 
-    heatmap_data = games_df.select(["GAME_DATE", "FG_PCT", "FG3_PCT"]).to_pandas()
+    # Export straight to numpy; shape (2, N) with one row per metric
+    shooting = games_df.select(["FG_PCT", "FG3_PCT"]).to_numpy().T
+    dates = games_df["GAME_DATE"].to_numpy()
 
     fig = px.imshow(
-        heatmap_data[["FG_PCT", "FG3_PCT"]].T,
+        shooting,
         labels=dict(x="Game", y="Metric", color="Percentage"),
-        x=heatmap_data["GAME_DATE"],
+        x=dates,
         y=["FG%", "3P%"],
         aspect="auto"
     )
@@ -123,25 +222,36 @@ def create_player_comparison_radar(player_stats: pl.DataFrame, player1: str, pla
         "AVG_BLK": "Blocks"
     }
 
+    # Aggregate both players in a single pass over the stats
+    avg_metrics = (player_stats
+                   .lazy()
+                   .filter(pl.col("PLAYER_NAME").is_in(players))
+                   .group_by("PLAYER_NAME", maintain_order=False)
+                   .agg([
+        pl.col("PTS").mean().round(1).alias("AVG_PTS"),
+        pl.col("REB").mean().round(1).alias("AVG_REB"),
+        pl.col("AST").mean().round(1).alias("AVG_AST"),
+        pl.col("FG_PCT").mean().round(3).alias("FG_PCT"),
+        pl.col("STL").mean().round(1).alias("AVG_STL"),
+        pl.col("BLK").mean().round(1).alias("AVG_BLK")
+    ])
+                   .collect()
+                   )
+
+    # Extract both rows in one pass instead of filtering the aggregate per player
+    rows = {row["PLAYER_NAME"]: row for row in avg_metrics.iter_rows(named=True)}
+
     fig = go.Figure()
+    max_value = 0
 
     for player in players:
-        player_data = player_stats.filter(pl.col("PLAYER_NAME") == player)
-        if not player_data.is_empty():
-            avg_metrics = (player_data
-            .group_by("PLAYER_NAME")
-            .agg([
-                pl.col("PTS").mean().round(1).alias("AVG_PTS"),
-                pl.col("REB").mean().round(1).alias("AVG_REB"),
-                pl.col("AST").mean().round(1).alias("AVG_AST"),
-                pl.col("FG_PCT").mean().round(3).alias("FG_PCT"),
-                pl.col("STL").mean().round(1).alias("AVG_STL"),
-                pl.col("BLK").mean().round(1).alias("AVG_BLK")
-            ])
-            )
+        row = rows.get(player)
+        if row is not None:
+            values = [row[metric] for metric in metrics.keys()]
+            max_value = max(max_value, *values)
 
             fig.add_trace(go.Scatterpolar(
-                r=[avg_metrics[metric][0] for metric in metrics.keys()],
+                r=values,
                 theta=list(metrics.values()),
                 fill='toself',
                 name=player
@@ -151,7 +261,7 @@ def create_player_comparison_radar(player_stats: pl.DataFrame, player1: str, pla
         polar=dict(
             radialaxis=dict(
                 visible=True,
-                range=[0, max([avg_metrics[metric][0] for metric in metrics.keys()])]
+                range=[0, max_value]
             )),
         showlegend=True,
         title="Player Performance Comparison"
@@ -160,6 +270,7 @@ def create_player_comparison_radar(player_stats: pl.DataFrame, player1: str, pla
     return fig
 
 
+@st.cache_data(ttl=3600, show_spinner=False, hash_funcs=_FRAME_HASH_FUNCS)
 def create_team_performance_radar(games_df: pl.DataFrame) -> go.Figure:
     """Create a radar chart for team performance"""
     metrics = {
@@ -171,7 +282,8 @@ def create_team_performance_radar(games_df: pl.DataFrame) -> go.Figure:
     }
 
     avg_metrics = (games_df
-    .group_by("SEASON")
+    .select(["SEASON", "PTS", "REB", "AST", "STL", "BLK"])
+    .group_by("SEASON", maintain_order=False)
     .agg([
         pl.col("PTS").mean().round(1).alias("AVG_PTS"),
         pl.col("REB").mean().round(1).alias("AVG_REB"),
@@ -181,22 +293,24 @@ def create_team_performance_radar(games_df: pl.DataFrame) -> go.Figure:
     ])
     )
 
+    # Scale the axis to the max over all seasons
+    max_value = avg_metrics.select(pl.max_horizontal(list(metrics.keys())).max()).item() or 0
+
     fig = go.Figure()
 
-    for season in avg_metrics["SEASON"]:
-        season_data = avg_metrics.filter(pl.col("SEASON") == season)
+    for row in avg_metrics.iter_rows(named=True):
         fig.add_trace(go.Scatterpolar(
-            r=[season_data[metric][0] for metric in metrics.keys()],
+            r=[row[metric] for metric in metrics.keys()],
             theta=list(metrics.values()),
             fill='toself',
-            name=season
+            name=row["SEASON"]
         ))
 
     fig.update_layout(
         polar=dict(
             radialaxis=dict(
                 visible=True,
-                range=[0, max([avg_metrics[metric][0] for metric in metrics.keys()])]
+                range=[0, max_value]
             )),
         showlegend=True,
         title="Team Performance Radar"
@@ -205,13 +319,14 @@ def create_team_performance_radar(games_df: pl.DataFrame) -> go.Figure:
     return fig
 
 
-def display_live_game(data_manager: RaptorsDataManager):
-    """Display live game information if available"""
+def display_live_game(data_manager: RaptorsDataManager) -> Optional[dict]:
+    """Display live game information if available and return the game shown"""
+    game = None
     try:
         live_game = data_manager.get_live_game_stats()
 
-        if live_game is not None and len(live_game) > 0:
-            game = live_game.to_dicts()[0]  # Convert first row to a dictionary
+        if live_game is not None:
+            game = live_game
 
             col1, col2, col3 = st.columns([2, 1, 2])
 
@@ -232,27 +347,35 @@ def display_live_game(data_manager: RaptorsDataManager):
     except Exception as e:
         st.error(f"Error displaying live game: {str(e)}")
 
+    return game
+
+
+def next_refresh_interval(refresh_rate: int, live_game: Optional[dict], auto_triggered: bool) -> float:
+    """Adaptive auto-refresh interval: fast while a game is live, backing off while idle"""
+    # gameStatus 2 means in progress; scheduled/final games poll 4x slower
+    if live_game is None or live_game.get("gameStatus") != 2:
+        st.session_state["idle_polls"] = 0
+        interval = refresh_rate * 4
+    else:
+        snapshot = (live_game["homeScore"], live_game["awayScore"], live_game["period"])
+        if snapshot == st.session_state.get("last_snapshot"):
+            # Only timer-driven reruns are polls; clicks and selections leave the backoff alone
+            if auto_triggered:
+                st.session_state["idle_polls"] = st.session_state.get("idle_polls", 0) + 1
+        else:
+            st.session_state["idle_polls"] = 0
+            st.session_state["last_snapshot"] = snapshot
+        # Double the interval for every poll where the score did not move, up to 8x
+        interval = refresh_rate * 2 ** min(st.session_state["idle_polls"], 3)
 
-def display_player_stats(data_manager: RaptorsDataManager, season: str = None):
-    """Display player statistics"""
-    try:
-        player_stats = load_player_stats(data_manager, season)
+    # Jitter so clients don't hit the NBA API in lockstep
+    return interval * random.uniform(0.8, 1.2)
 
-        if player_stats is not None:
-            recent_stats = (player_stats
-                            .lazy()
-                            .group_by(["SEASON", "PLAYER_NAME"])
-                            .agg([
-                pl.col("PTS").mean().round(1).alias("AVG_PTS"),
-                pl.col("REB").mean().round(1).alias("AVG_REB"),
-                pl.col("AST").mean().round(1).alias("AVG_AST"),
-                pl.col("FG_PCT").mean().round(3).alias("FG_PCT"),
-                pl.col("PTS").count().alias("GAMES_PLAYED")
-            ])
-                            .sort(["SEASON", "AVG_PTS"], descending=[True, True])
-                            .collect()
-                            )
 
+def display_player_stats(recent_stats: Optional[pl.DataFrame]):
+    """Display player statistics"""
+    try:
+        if recent_stats is not None:
             st.dataframe(
                 recent_stats,
                 use_container_width=True,
@@ -274,6 +397,10 @@ def display_cache_stats():
     with col3:
         st.metric("Cache Size", stats['memory_cache_size'])
 
+    # Per-loader latency: sub-millisecond medians mean st.cache_data is serving hits
+    for name, samples in st.session_state.get("cache_timings", {}).items():
+        st.caption(f"{name}: p50 {statistics.median(samples) * 1000:.1f} ms over {len(samples)} calls")
+
 
 def main():
     st.set_page_config(
@@ -284,7 +411,7 @@ def main():
 
     # Initialize managers
     data_manager = RaptorsDataManager()
-    predictor = RaptorsPredictor()
+    predictor = get_predictor()
 
     # Header
     st.title("Toronto Raptors Analytics Dashboard")
@@ -321,32 +448,42 @@ def main():
         # Display cache stats
         display_cache_stats()
 
+    # Prefetch team games and player stats concurrently so a cold cache overlaps both API trips
+    ctx = get_script_run_ctx()
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=2,
+        initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)
+    )
+    games_future = executor.submit(timed_load, "load_team_games", load_team_games, data_manager, season)
+    players_future = executor.submit(timed_load, "load_player_stats", load_player_stats, data_manager, season)
+    # No context manager: its exit would block here until both loads finish, before any tab renders.
+    # Each tab resolves its own future, so the live game shows while the loads are still running
+    executor.shutdown(wait=False)
+
     # Main content using tabs
     tab1, tab2, tab3 = st.tabs(["Live Game", "Team Stats", "Player Stats"])
 
     with tab1:
         st.subheader("Live Game Status")
-        display_live_game(data_manager)
+        live_game = display_live_game(data_manager)
 
         # Prediction section
         if st.button("Generate Next Game Prediction"):
             with st.spinner("Training prediction model..."):
                 try:
                     # Get only the current season's games
-                    games_df = load_team_games(data_manager, "2024-25")
-
-                    if games_df is not None and len(games_df) >= 10:
-                        features_df = predictor.prepare_features(games_df)
+                    current_games = timed_load("load_team_games", load_team_games, data_manager, "2024-25")
 
+                    if current_games is not None and len(current_games) >= 10:
                         if not predictor.model_path.exists():
-                            score = predictor.train(games_df)
+                            score = predictor.train(current_games)
                             st.write(f"Model R² Score: {score:.3f}")
 
-                        prediction = predictor.predict(features_df)
+                        prediction = predictor.predict(current_games)
                         st.metric(
                             "Predicted Points Next Game",
                             f"{prediction:.1f}",
-                            delta=f"{prediction - games_df['PTS'].mean():.1f} vs average"
+                            delta=f"{prediction - current_games['PTS'].mean():.1f} vs average"
                         )
                     else:
                         st.warning("Need at least 10 games in the current season for prediction")
@@ -358,7 +495,7 @@ def main():
 
         # Load data with progress indicator
         with st.spinner("Loading team stats..."):
-            games_df = load_team_games(data_manager, season)
+            games_df = games_future.result()
 
         if games_df is not None:
             # Create and display team stats chart
@@ -375,10 +512,8 @@ def main():
             # Display recent game results
             st.subheader("Recent Games")
             recent_games = (games_df
-                .lazy()
-                .head(5)
                 .select([
-                    "GAME_DATE",
+                    pl.col("GAME_DATE").dt.date(),
                     "SEASON",
                     "MATCHUP",
                     "WL",
@@ -386,7 +521,7 @@ def main():
                     "FG_PCT",
                     "FG3_PCT"
                 ])
-                .collect()
+                .head(5)
             )
             if not recent_games.is_empty():
                 st.dataframe(
@@ -399,22 +534,41 @@ def main():
 
     with tab3:
         st.subheader("Player Statistics")
-        player_stats = load_player_stats(data_manager, season)
+        player_stats = players_future.result()
 
         if player_stats is not None:
-            display_player_stats(data_manager, season)
+            display_player_stats(
+                timed_load("load_player_averages", load_player_averages, data_manager, season)
+            )
 
             # Add Player Comparison Radar Chart
-            player1 = st.selectbox("Select Player 1", player_stats["PLAYER_NAME"].unique())
-            player2 = st.selectbox("Select Player 2", player_stats["PLAYER_NAME"].unique(), index=1)
-            radar_chart = create_player_comparison_radar(player_stats, player1, player2)
+            player_names = load_player_names(data_manager, season)
+            player1 = st.selectbox("Select Player 1", player_names)
+            player2 = st.selectbox("Select Player 2", player_names, index=1)
+            radar_stats = load_player_radar_stats(data_manager, season)
+            radar_chart = create_player_comparison_radar(radar_stats, player1, player2)
             if radar_chart:
                 st.plotly_chart(radar_chart, use_container_width=True)
 
-    # Auto-refresh logic
+    # Auto-refresh logic: a browser-side timer triggers the rerun, so the script thread never sleeps
     if auto_refresh:
-        time.sleep(refresh_rate)
-        st.rerun()
+        # The timer's count only changes on reruns it triggered; the interval worked out here
+        # takes effect from the next rerun, since the count is only known once the timer renders.
+        # A stored interval built from another slider value is stale, so the new rate applies at once
+        interval_ms = refresh_rate * 1000
+        if st.session_state.get("refresh_interval_rate") == refresh_rate:
+            interval_ms = st.session_state.get("refresh_interval_ms", interval_ms)
+        count = st_autorefresh(interval=interval_ms, key="data_refresh")
+        auto_triggered = count != st.session_state.get("refresh_count", 0)
+        st.session_state["refresh_count"] = count
+        st.session_state["refresh_interval_ms"] = int(
+            next_refresh_interval(refresh_rate, live_game, auto_triggered) * 1000
+        )
+        st.session_state["refresh_interval_rate"] = refresh_rate
+    else:
+        # Switching auto-refresh back on starts over from the slider's rate and a fresh timer count
+        for key in ("refresh_interval_ms", "refresh_interval_rate", "refresh_count"):
+            st.session_state.pop(key, None)
 
 if __name__ == "__main__":
     main()
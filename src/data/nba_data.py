@@ -2,8 +2,10 @@ from nba_api.stats.static import teams
 from nba_api.stats.endpoints import teamgamelog, commonteamroster
 from nba_api.live.nba.endpoints import scoreboard
 import polars as pl
+import numpy as np
 from datetime import datetime
 import time
+import threading
 from pathlib import Path
 import concurrent.futures
 from typing import List, Optional
@@ -12,6 +14,31 @@ from src.utils.config import Config
 from src.utils.cache import cache_decorator, RedisCache
 
 
+def _rows_to_polars(headers: List[str], rows: List[list]) -> pl.DataFrame:
+    """Build a polars DataFrame straight from nba_api result-set rows, skipping pandas"""
+    if not rows:
+        # Nothing to infer from; String columns keep the downstream str.to_date/casts valid
+        return pl.DataFrame(schema={header: pl.String for header in headers})
+    # Infer dtypes from every row so a float appearing late in an int-looking column isn't truncated
+    return pl.DataFrame(rows, schema=headers, orient="row", infer_schema_length=None)
+
+
+def _season_comparison(games: pl.LazyFrame) -> pl.LazyFrame:
+    """Per-season averages over a team games plan"""
+    return (games
+            .group_by("SEASON")
+            .agg([
+        pl.col("PTS").mean().round(1).alias("AVG_PTS"),
+        pl.col("FG_PCT").mean().round(3).alias("AVG_FG_PCT"),
+        pl.col("FG3_PCT").mean().round(3).alias("AVG_FG3_PCT"),
+        pl.col("REB").mean().round(1).alias("AVG_REB"),
+        pl.col("AST").mean().round(1).alias("AVG_AST"),
+        pl.col("PTS").count().alias("GAMES_PLAYED")
+    ])
+            .sort("SEASON", descending=True)
+            )
+
+
 class RaptorsDataManager:
     def __init__(self):
         self.config = Config()
@@ -19,13 +46,26 @@ class RaptorsDataManager:
         self.api_delay = self.config.nba_delay
         self.seasons = ["2023-24", "2024-25"]
         self.cache = RedisCache()
+        self.api_burst = self.config.nba_burst
+        self._rate_lock = threading.Lock()
+        self._tokens = float(self.api_burst)
+        self._last_refill = time.monotonic()
 
     def _rate_limit(self):
-        """Implement rate limiting for API calls"""
-        time.sleep(self.api_delay)
+        """Token-bucket rate limiting for API calls, shared by all worker threads"""
+        # Tokens refill at one per api_delay up to api_burst; a caller that finds the bucket
+        # empty reserves the next token and sleeps outside the lock until it is due
+        with self._rate_lock:
+            now = time.monotonic()
+            self._tokens = min(self.api_burst, self._tokens + (now - self._last_refill) / self.api_delay)
+            self._last_refill = now
+            self._tokens -= 1
+            wait = -self._tokens * self.api_delay
+        if wait > 0:
+            time.sleep(wait)
 
-    def _fetch_season_games_async(self, season: str) -> Optional[pl.DataFrame]:
-        """Fetch games for a season asynchronously"""
+    def _fetch_season_games_async(self, season: str) -> Optional[pl.LazyFrame]:
+        """Fetch games for a season asynchronously, leaving the casts to the caller's plan"""
         try:
             self._rate_limit()
             game_log = teamgamelog.TeamGameLog(
@@ -33,10 +73,13 @@ class RaptorsDataManager:
                 season=season
             )
 
-            df = pl.from_pandas(game_log.get_data_frames()[0])
+            result_set = game_log.get_dict()["resultSets"][0]
+            if not result_set["rowSet"]:
+                return None  # No games played yet this season
+            df = _rows_to_polars(result_set["headers"], result_set["rowSet"])
             return (df.lazy()
                     .with_columns([
-                pl.col("GAME_DATE").str.strptime(pl.Date, "%b %d, %Y", strict=False),
+                pl.col("GAME_DATE").str.to_date("%b %d, %Y", strict=False),
                 pl.col("PTS").cast(pl.Int32),
                 pl.col("FG_PCT").cast(pl.Float32),
                 pl.col("FG3_PCT").cast(pl.Float32),
@@ -44,8 +87,6 @@ class RaptorsDataManager:
                 pl.col("AST").cast(pl.Int32),
                 pl.lit(season).alias("SEASON")
             ])
-                    .sort("GAME_DATE", descending=True)
-                    .collect()
                     )
         except Exception as e:
             print(f"Error fetching games for season {season}: {e}")
@@ -57,23 +98,36 @@ class RaptorsDataManager:
         if season is None:
             # Fetch all seasons in parallel
             with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
-                future_to_season = {
-                    executor.submit(self._fetch_season_games_async, s): s
-                    for s in self.seasons
-                }
+                all_games = [games for games in executor.map(self._fetch_season_games_async, self.seasons)
+                             if games is not None]
 
-                all_games = []
-                for future in concurrent.futures.as_completed(future_to_season):
-                    result = future.result()
-                    if result is not None:
-                        all_games.append(result)
+            if not all_games:
+                return None
+            games = pl.concat(all_games, how="vertical", rechunk=False)
+        else:
+            # Only the requested season is fetched, so nothing outside it reaches the sort
+            games = self._fetch_season_games_async(season)
+            if games is None:
+                return None
 
-            return pl.concat(all_games) if all_games else None
+        # One plan and a single sort over the combined seasons keeps all-season results in date order
+        games = games.sort("GAME_DATE", descending=True)
+        try:
+            # The date parsing and casts only run here, so collection failures are fetch failures too
+            if season is not None:
+                return games.collect()
 
-        return self._fetch_season_games_async(season)
+            # The all-season frame also yields the season comparison: collect both from the shared plan
+            # and store the small aggregate under its own key so readers never load the full frame
+            games_df, comparison = pl.collect_all([games, _season_comparison(games)])
+        except Exception as e:
+            print(f"Error processing games for season {season or 'all'}: {e}")
+            return None
+        self.cache.set(RaptorsDataManager.get_season_comparison.cache_key(self), comparison, expire_in=3600)
+        return games_df
 
     @cache_decorator(expire_in=60)  # Cache for 1 minute
-    def get_live_game_stats(self) -> Optional[pl.DataFrame]:
+    def get_live_game_stats(self) -> Optional[dict]:
         """Fetch live game stats if a game is in progress"""
         self._rate_limit()
         try:
@@ -89,7 +143,7 @@ class RaptorsDataManager:
             )
 
             if raptors_game:
-                return pl.DataFrame([{
+                return {
                     'gameId': raptors_game['gameId'],
                     'homeTeam': raptors_game['homeTeam']['teamName'],
                     'awayTeam': raptors_game['awayTeam']['teamName'],
@@ -98,15 +152,14 @@ class RaptorsDataManager:
                     'period': raptors_game.get('period', 0),
                     'gameClock': raptors_game.get('gameClock', ''),
                     'gameStatus': raptors_game.get('gameStatus', 'Unknown')
-                }])
+                }
             return None
         except Exception as e:
             print(f"Error fetching live game stats: {e}")
             return None
 
-    def _fetch_player_stats_async(self, player_id: str, player_name: str,
-                                  season: str) -> Optional[pl.DataFrame]:
-        """Fetch player stats asynchronously"""
+    def _fetch_player_stats_async(self, player_id: str, season: str) -> Optional[dict]:
+        """Fetch a player's raw game-log result set asynchronously"""
         self._rate_limit()
         try:
             from nba_api.stats.endpoints import playergamelog
@@ -114,15 +167,7 @@ class RaptorsDataManager:
                 player_id=str(player_id),
                 season=season
             )
-            df = pl.from_pandas(player_log.get_data_frames()[0])
-            if not df.is_empty():
-                return (df.lazy()
-                        .with_columns([
-                    pl.lit(player_name).alias("PLAYER_NAME"),
-                    pl.lit(season).alias("SEASON")
-                ])
-                        .collect()
-                        )
+            return player_log.get_dict()["resultSets"][0]
         except Exception as e:
             print(f"Error fetching stats for player {player_id} in season {season}: {e}")
         return None
@@ -133,40 +178,53 @@ class RaptorsDataManager:
         # Get current roster
         self._rate_limit()
         roster = commonteamroster.CommonTeamRoster(team_id=self.team_id)
-        roster_df = pl.from_pandas(roster.get_data_frames()[0])
+        roster_set = roster.get_dict()["resultSets"][0]
+        roster_df = _rows_to_polars(roster_set["headers"], roster_set["rowSet"])
 
-        # Create player ID to name mapping
-        player_mapping = dict(zip(roster_df["PLAYER_ID"], roster_df["PLAYER"]))
+        # Player IDs and names in roster order, one batched conversion per column
+        player_ids = roster_df.get_column("PLAYER_ID").to_list()
+        player_names = roster_df.get_column("PLAYER").to_list()
 
         seasons_to_fetch = [season] if season else self.seasons
-        all_stats = []
-
-        for s in seasons_to_fetch:
-            # Fetch player stats in parallel
-            with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
-                future_to_player = {
-                    executor.submit(
-                        self._fetch_player_stats_async,
-                        player_id,
-                        player_mapping[player_id],
-                        s
-                    ): player_id
-                    for player_id in player_mapping
-                }
+        # One flat work list over every (player, season) pair, so seasons are fetched concurrently too
+        tasks = [(player_id, name, s) for s in seasons_to_fetch for player_id, name in zip(player_ids, player_names)]
+        game_logs = []  # (player name, season, raw game-log result set)
+
+        # Read every cached game log in one round trip; only the misses hit the API
+        keys = [f"player_log:{player_id}:{s}" for player_id, _, s in tasks]
+        logs = self.cache.mget(keys)
+        to_fetch = [(player_id, s) for (player_id, _, s), log in zip(tasks, logs) if log is None]
+
+        if to_fetch:
+            # Fetch in parallel; _rate_limit keeps the combined rate within the token bucket
+            with concurrent.futures.ThreadPoolExecutor(max_workers=min(6, len(to_fetch))) as executor:
+                fetched = dict(zip(to_fetch, executor.map(lambda task: self._fetch_player_stats_async(*task), to_fetch)))
 
-                for future in concurrent.futures.as_completed(future_to_player):
-                    result = future.result()
-                    if result is not None:
-                        all_stats.append(result)
+        for (player_id, name, s), key, log in zip(tasks, keys, logs):
+            if log is None:
+                log = fetched[(player_id, s)]
+                if log is not None:
+                    self.cache.set(key, log, expire_in=3600)
+            if log is not None and log["rowSet"]:
+                game_logs.append((name, s, log))
 
-        if not all_stats:
+        if not game_logs:
             return None
 
+        # Build one frame from every player's rows, name/season columns repeated per game log
+        names, seasons, result_sets = zip(*game_logs)
+        lengths = np.fromiter((len(rs["rowSet"]) for rs in result_sets), dtype=np.int64, count=len(result_sets))
+        rows = [row for rs in result_sets for row in rs["rowSet"]]
+        combined = _rows_to_polars(result_sets[0]["headers"], rows).with_columns([
+            pl.Series("PLAYER_NAME", np.repeat(np.array(names, dtype=object), lengths), dtype=pl.Utf8),
+            pl.Series("SEASON", np.repeat(np.array(seasons, dtype=object), lengths), dtype=pl.Utf8)
+        ])
+
         # Process all stats at once
-        return (pl.concat(all_stats)
+        return (combined
                 .lazy()
                 .with_columns([
-            pl.col("GAME_DATE").str.strptime(pl.Date, "%b %d, %Y", strict=False),
+            pl.col("GAME_DATE").str.to_date("%b %d, %Y", strict=False),
             pl.col("FG_PCT").cast(pl.Float32),
             pl.col("FG3_PCT").cast(pl.Float32),
             pl.col("FT_PCT").cast(pl.Float32),
@@ -202,20 +260,7 @@ class RaptorsDataManager:
         if games_df is None:
             return None
 
-        return (games_df
-                .lazy()
-                .group_by("SEASON")
-                .agg([
-            pl.col("PTS").mean().round(1).alias("AVG_PTS"),
-            pl.col("FG_PCT").mean().round(3).alias("AVG_FG_PCT"),
-            pl.col("FG3_PCT").mean().round(3).alias("AVG_FG3_PCT"),
-            pl.col("REB").mean().round(1).alias("AVG_REB"),
-            pl.col("AST").mean().round(1).alias("AVG_AST"),
-            pl.col("PTS").count().alias("GAMES_PLAYED")
-        ])
-                .sort("SEASON", descending=True)
-                .collect()
-                )
+        return _season_comparison(games_df.lazy()).collect()
 
     def clear_cache(self):
         """Clear all caches"""
@@ -1,82 +1,88 @@
 import polars as pl
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.preprocessing import StandardScaler
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingRegressor
 from sklearn.model_selection import train_test_split
 import joblib
 from pathlib import Path
 
-from src.utils.config import Config
+from src.utils.config import Config, RANDOM_STATE, TEST_SIZE
 
+SOURCE_COLS = ["PTS", "FG_PCT", "FG3_PCT", "REB", "AST"]
+FEATURE_COLS = ["pts_ma_5", "fg_pct_ma_5", "fg3_pct_ma_5", "reb_ma_5", "ast_ma_5"]
 
 class RaptorsPredictor:
     def __init__(self):
         self.config = Config()
-        self.model = RandomForestRegressor(
-            n_estimators=100,
-            random_state=self.config.get('ml', 'model', 'training', 'random_state', default=42)
+        # Histogram boosting is scale-invariant, so no scaler is fitted or persisted
+        self.model = HistGradientBoostingRegressor(
+            max_iter=200,
+            learning_rate=0.05,
+            max_bins=255,
+            random_state=RANDOM_STATE
         )
-        self.scaler = StandardScaler()
 
         # Create models directory if it doesn't exist
         model_dir = Path(self.config.model_path)
         model_dir.mkdir(parents=True, exist_ok=True)
-        self.model_path = model_dir / "raptors_predictor.joblib"
+        self.model_path = model_dir / "raptors_predictor_hgb.joblib"
+        self._loaded = False
 
-    def prepare_features(self, df: pl.DataFrame) -> pl.DataFrame:
-        """Prepare features for prediction using Polars"""
+    def _feature_plan(self, df: pl.DataFrame) -> pl.LazyFrame:
+        """Build the lazy plan for rolling features and the next-game points target"""
         window_size = 5  # Use a fixed window size for simplicity
 
-        # Create rolling averages for each feature
-        features_df = (df
-                       .with_columns([
-            pl.col("PTS").rolling_mean(window_size).alias("pts_ma_5"),
-            pl.col("FG_PCT").rolling_mean(window_size).alias("fg_pct_ma_5"),
-            pl.col("FG3_PCT").rolling_mean(window_size).alias("fg3_pct_ma_5"),
-            pl.col("REB").rolling_mean(window_size).alias("reb_ma_5"),
-            pl.col("AST").rolling_mean(window_size).alias("ast_ma_5")
+        # Rolling averages run oldest-first so each row only sees games already played;
+        # the target is the points scored in the following game
+        return (df
+                .lazy()
+                .sort("GAME_DATE")
+                .with_columns([
+            pl.col(source).rolling_mean(window_size).alias(feature)
+            for source, feature in zip(SOURCE_COLS, FEATURE_COLS)
         ])
-                       .drop_nulls()
-                       )
-
-        return features_df
+                .with_columns(pl.col("PTS").shift(-1).alias("target"))
+                )
 
     def train(self, df: pl.DataFrame):
         """Train the prediction model"""
-        features_df = self.prepare_features(df)
-
-        # Prepare features and target
-        feature_cols = ["pts_ma_5", "fg_pct_ma_5", "fg3_pct_ma_5", "reb_ma_5", "ast_ma_5"]
-        X = features_df.select(feature_cols).to_numpy()
-        y = df.get_column("PTS").tail(len(X)).to_numpy()
-
-        # Split and scale
+        # Features and target come out of one plan as a single float32 matrix
+        matrix = (self._feature_plan(df)
+                  .select(FEATURE_COLS + ["target"])
+                  .drop_nulls()
+                  .collect()
+                  .to_numpy()
+                  .astype(np.float32))
+        X, y = matrix[:, :-1], matrix[:, -1]
+
+        # Split
         X_train, X_test, y_train, y_test = train_test_split(
             X, y,
-            test_size=self.config.get('ml', 'model', 'training', 'test_size', default=0.2),
-            random_state=self.config.get('ml', 'model', 'training', 'random_state', default=42)
+            test_size=TEST_SIZE,
+            random_state=RANDOM_STATE
         )
 
-        X_train_scaled = self.scaler.fit_transform(X_train)
-
         # Train model
-        self.model.fit(X_train_scaled, y_train)
+        self.model.fit(X_train, y_train)
 
         # Save model
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
-        joblib.dump((self.model, self.scaler), self.model_path)
+        joblib.dump(self.model, self.model_path)
+        self._loaded = True  # self.model is now the saved model
 
         # Return test score
-        X_test_scaled = self.scaler.transform(X_test)
-        return self.model.score(X_test_scaled, y_test)
+        return self.model.score(X_test, y_test)
 
-    def predict(self, features_df: pl.DataFrame) -> float:
+    def predict(self, df: pl.DataFrame) -> float:
         """Make predictions for next game"""
         if not self.model_path.exists():
             raise ValueError("Model not trained yet!")
 
-        feature_cols = ["pts_ma_5", "fg_pct_ma_5", "fg3_pct_ma_5", "reb_ma_5", "ast_ma_5"]
-        features = features_df.select(feature_cols).to_numpy()
+        # The next game only needs the latest 5-game averages, i.e. the means of the 5 most recent games
+        recent = df.top_k(5, by="GAME_DATE").select(SOURCE_COLS).to_numpy().astype(np.float32)
+        features = recent.mean(axis=0, keepdims=True)
 
-        self.model, self.scaler = joblib.load(self.model_path)
-        features_scaled = self.scaler.transform(features)
-        return self.model.predict(features_scaled)[-1]  # Return latest prediction
+        # Deserialize the saved model once per instance rather than on every prediction
+        if not self._loaded:
+            self.model = joblib.load(self.model_path)
+            self._loaded = True
+        return self.model.predict(features)[0]
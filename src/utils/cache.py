@@ -1,10 +1,27 @@
 import redis
+import hashlib
+import inspect
 import polars as pl
-import json
+import io
+import os
+import orjson
 from functools import wraps
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, List, Optional
 import time
+import threading
+from collections import OrderedDict
+
+# Payload prefixes identifying how a cached value was serialized
+ARROW_MAGIC = b"ARROW1"
+JSON_MAGIC = b"JSON1"
+
+REDIS_MAX_CONNECTIONS = 32
+MEMORY_CACHE_CAPACITY = 256
+MEMORY_CACHE_TTL = 300  # Seconds a value read back from Redis stays in memory
+
+# Minimum bytes x TTL x reuse rate for cache_decorator to store a result
+CACHE_ADMISSION_THRESHOLD = 5_000
 
 
 class RedisCache:
@@ -18,35 +35,57 @@ class RedisCache:
 
     def _initialize(self):
         """Initialize Redis connection and caching systems"""
-        self.redis = redis.Redis(host='redis', port=6379, decode_responses=True)
-        self._memory_cache = {}
+        # One bounded pool per process; threads wait for a free connection instead of opening more
+        self.pool = redis.BlockingConnectionPool.from_url(
+            os.getenv('REDIS_URL', 'redis://redis:6379'),
+            max_connections=REDIS_MAX_CONNECTIONS
+        )
+        self.redis = redis.Redis(connection_pool=self.pool)
+        self._memory_cache = OrderedDict()  # key -> (value, expiry), least recently used first
+        self._memory_lock = threading.Lock()
         self._cache_stats = {
             'hits': 0,
             'misses': 0,
             'api_calls': 0
         }
 
+    def _memory_get(self, key: str) -> Optional[Any]:
+        """Look up a live memory-cache entry, marking it most recently used"""
+        with self._memory_lock:
+            entry = self._memory_cache.get(key)
+            if entry is None:
+                return None
+            value, expiry = entry
+            if expiry <= time.time():
+                del self._memory_cache[key]
+                return None
+            self._memory_cache.move_to_end(key)
+            return value
+
+    def _memory_put(self, key: str, value: Any, ttl: float):
+        """Store a memory-cache entry, evicting the least recently used beyond capacity"""
+        with self._memory_lock:
+            self._memory_cache[key] = (value, time.time() + ttl)
+            self._memory_cache.move_to_end(key)
+            while len(self._memory_cache) > MEMORY_CACHE_CAPACITY:
+                self._memory_cache.popitem(last=False)
+
     def get(self, key: str) -> Optional[Any]:
         """Get value from cache with stats tracking"""
         # Try memory cache first
-        if key in self._memory_cache:
-            value, expiry = self._memory_cache[key]
-            if expiry > time.time():
-                self._cache_stats['hits'] += 1
-                return value
-            else:
-                del self._memory_cache[key]
+        value = self._memory_get(key)
+        if value is not None:
+            self._cache_stats['hits'] += 1
+            return value
 
         # Try Redis cache
         try:
             value = self.redis.get(key)
-            if value:
+            data = self._decode(value) if value else None
+            if data is not None:
                 self._cache_stats['hits'] += 1
                 # Store in memory cache for faster subsequent access
-                data = json.loads(value)
-                if isinstance(data, dict) and all(isinstance(v, list) for v in data.values()):
-                    data = pl.DataFrame(data)
-                self._memory_cache[key] = (data, time.time() + 300)  # 5-minute memory cache
+                self._memory_put(key, data, MEMORY_CACHE_TTL)
                 return data
         except Exception as e:
             print(f"Cache error: {e}")
@@ -54,19 +93,55 @@ class RedisCache:
         self._cache_stats['misses'] += 1
         return None
 
+    def mget(self, keys: List[str]) -> List[Optional[Any]]:
+        """Get several values with a single Redis round trip, memory cache first"""
+        results = [self._memory_get(key) for key in keys]
+        missing = [i for i, result in enumerate(results) if result is None]
+
+        if missing:
+            try:
+                values = self.redis.mget([keys[i] for i in missing])
+                for i, value in zip(missing, values):
+                    data = self._decode(value) if value else None
+                    if data is not None:
+                        self._memory_put(keys[i], data, MEMORY_CACHE_TTL)
+                        results[i] = data
+            except Exception as e:
+                print(f"Cache mget error: {e}")
+
+        hits = sum(result is not None for result in results)
+        self._cache_stats['hits'] += hits
+        self._cache_stats['misses'] += len(keys) - hits
+        return results
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        """Encode a value for Redis, DataFrames as lz4-compressed Arrow IPC"""
+        if isinstance(value, pl.DataFrame):
+            buf = io.BytesIO()
+            value.write_ipc(buf, compression="lz4")
+            return ARROW_MAGIC + buf.getvalue()
+        return JSON_MAGIC + orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC)
+
+    @staticmethod
+    def _decode(value: bytes) -> Optional[Any]:
+        """Decode a payload from Redis by its magic prefix; unknown payloads read as a miss"""
+        if value.startswith(ARROW_MAGIC):
+            return pl.read_ipc(io.BytesIO(value[len(ARROW_MAGIC):]))
+        if value.startswith(JSON_MAGIC):
+            return orjson.loads(value[len(JSON_MAGIC):])
+        return None
+
     def set(self, key: str, value: Any, expire_in: int = 3600):
         """Set value in cache with stats tracking"""
         try:
-            if isinstance(value, pl.DataFrame):
-                value = value.to_dict(as_series=False)
-
             # Store in both Redis and memory cache
             self.redis.setex(
                 key,
                 timedelta(seconds=expire_in),
-                json.dumps(value)
+                self._encode(value)
             )
-            self._memory_cache[key] = (value, time.time() + expire_in)
+            self._memory_put(key, value, expire_in)
         except Exception as e:
             print(f"Cache set error: {e}")
 
@@ -74,8 +149,8 @@ class RedisCache:
         """Delete key from cache"""
         try:
             self.redis.delete(key)
-            if key in self._memory_cache:
-                del self._memory_cache[key]
+            with self._memory_lock:
+                self._memory_cache.pop(key, None)
         except Exception as e:
             print(f"Cache delete error: {e}")
 
@@ -101,7 +176,8 @@ class RedisCache:
         """Clear all caches"""
         try:
             self.redis.flushall()
-            self._memory_cache.clear()
+            with self._memory_lock:
+                self._memory_cache.clear()
             self._cache_stats = {
                 'hits': 0,
                 'misses': 0,
@@ -111,22 +187,59 @@ class RedisCache:
             print(f"Cache clear error: {e}")
 
 
+def cache_key(func, args: tuple, kwargs: dict) -> str:
+    """Build a process-independent cache key for a call to func"""
+    bound = inspect.signature(func).bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = dict(bound.arguments)
+
+    # Methods are keyed without self, whose repr embeds the object's address
+    if '.' in func.__qualname__.rsplit('<locals>.', 1)[-1]:
+        arguments.pop(next(iter(arguments)), None)
+
+    payload = orjson.dumps([func.__module__, func.__qualname__, arguments],
+                           option=orjson.OPT_SORT_KEYS, default=str)
+    return f"{func.__name__}:{hashlib.blake2b(payload, digest_size=16).hexdigest()}"
+
+
+def _estimated_size(value: Any) -> int:
+    """Approximate the serialized size of a value in bytes"""
+    if isinstance(value, pl.DataFrame):
+        return value.estimated_size()
+    return len(orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY, default=str))
+
+
 def cache_decorator(expire_in: int = 3600):
     """Enhanced cache decorator with performance tracking"""
 
     def decorator(func):
+        # Per-function reuse tracking for the admission filter. A call counts as a reuse when it
+        # hits the cache or asks for a key computed within expire_in, so skipped keys still
+        # build up a history and get admitted once they are requested often enough.
+        reuse = {'calls': 0, 'reuses': 0}
+        last_computed = {}
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             cache = RedisCache()
 
             # Create cache key from function name and arguments
-            key = f"{func.__name__}:{str(args)}:{str(kwargs)}"
+            key = cache_key(func, args, kwargs)
+            reuse['calls'] += 1
 
             # Try to get from cache
             result = cache.get(key)
             if result is not None:
+                reuse['reuses'] += 1
                 return result
 
+            now = time.time()
+            if now - last_computed.pop(key, float('-inf')) < expire_in:
+                reuse['reuses'] += 1
+            last_computed[key] = now
+            if len(last_computed) > MEMORY_CACHE_CAPACITY:
+                del last_computed[next(iter(last_computed))]  # Oldest computation
+
             # If not in cache, call function and cache result
             cache.track_api_call()
             start_time = time.time()
@@ -137,9 +250,13 @@ def cache_decorator(expire_in: int = 3600):
             print(f"API call to {func.__name__} took {execution_time:.2f} seconds")
 
             if result is not None:
-                cache.set(key, result, expire_in)
+                # Only store results likely to be read again before they expire
+                reuse_rate = (reuse['reuses'] + 1) / (reuse['calls'] + 2)
+                if _estimated_size(result) * expire_in * reuse_rate >= CACHE_ADMISSION_THRESHOLD:
+                    cache.set(key, result, expire_in)
             return result
 
+        wrapper.cache_key = lambda *args, **kwargs: cache_key(func, args, kwargs)
         return wrapper
 
     return decorator
@@ -1,91 +1,107 @@
 import yaml
 from pathlib import Path
-from typing import Dict, Any
-from functools import lru_cache
+from types import MappingProxyType
+from typing import Dict, Any, Mapping
+
+
+def _load_yaml_or_default() -> Dict[str, Any]:
+    """Load the config file, falling back to default values"""
+    # Look for config file in src/config
+    config_path = Path(__file__).parent.parent / "config" / "config.yaml"
+    if not config_path.exists():
+        # Use default values if config file doesn't exist
+        return {
+            'api': {
+                'nba': {
+                    'delay': 1.5,
+                    'burst': 3,
+                    'team_id': "1610612761"  # Raptors ID
+                }
+            },
+            'dashboard': {
+                'refresh_rate': 30,
+                'default_season': "2023-24",
+                'charts': {
+                    'max_points': 2000,
+                    'colors': {
+                        'primary': "#CE1141",
+                        'secondary': "#000000",
+                        'accent': "#A1A1A4"
+                    }
+                }
+            },
+            'ml': {
+                'model': {
+                    'update_frequency': 86400,
+                    'features': [
+                        'pts_ma_5',
+                        'fg_pct_ma_5',
+                        'fg3_pct_ma_5',
+                        'reb_ma_5',
+                        'ast_ma_5'
+                    ],
+                    'window_sizes': {
+                        'short': 5,
+                        'medium': 10,
+                        'long': 20
+                    },
+                    'training': {
+                        'test_size': 0.2,
+                        'random_state': 42
+                    }
+                }
+            },
+            'paths': {
+                'models': 'models',
+                'data': 'data'
+            }
+        }
+
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def _freeze(value: Any) -> Any:
+    """Wrap nested dicts in read-only mappings"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    return value
+
+
+def cfg(*keys: str, default: Any = None) -> Any:
+    """Get a config value using dot notation"""
+    value = _CONFIG
+    for key in keys:
+        if isinstance(value, Mapping):
+            value = value.get(key, default)
+        else:
+            return default
+    return value
+
 
 class Config:
     _instance = None
-    _config: Dict[str, Any] = {}
 
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super(Config, cls).__new__(cls)
-            cls._instance._load_config()
         return cls._instance
 
-    @lru_cache()
-    def _load_config(self):
-        """Load config file with caching"""
-        # Look for config file in src/config
-        config_path = Path(__file__).parent.parent / "config" / "config.yaml"
-        if not config_path.exists():
-            # Use default values if config file doesn't exist
-            self._config = {
-                'api': {
-                    'nba': {
-                        'delay': 1.5,
-                        'team_id': "1610612761"  # Raptors ID
-                    }
-                },
-                'dashboard': {
-                    'refresh_rate': 30,
-                    'default_season': "2023-24",
-                    'charts': {
-                        'colors': {
-                            'primary': "#CE1141",
-                            'secondary': "#000000",
-                            'accent': "#A1A1A4"
-                        }
-                    }
-                },
-                'ml': {
-                    'model': {
-                        'update_frequency': 86400,
-                        'features': [
-                            'pts_ma_5',
-                            'fg_pct_ma_5',
-                            'fg3_pct_ma_5',
-                            'reb_ma_5',
-                            'ast_ma_5'
-                        ],
-                        'window_sizes': {
-                            'short': 5,
-                            'medium': 10,
-                            'long': 20
-                        },
-                        'training': {
-                            'test_size': 0.2,
-                            'random_state': 42
-                        }
-                    }
-                },
-                'paths': {
-                    'models': 'models',
-                    'data': 'data'
-                }
-            }
-            return
-
-        with open(config_path, 'r') as f:
-            self._config = yaml.safe_load(f)
-
     def get(self, *keys: str, default: Any = None) -> Any:
         """Get a config value using dot notation"""
-        value = self._config
-        for key in keys:
-            if isinstance(value, dict):
-                value = value.get(key, default)
-            else:
-                return default
-        return value
+        return cfg(*keys, default=default)
 
     @property
     def nba_delay(self) -> float:
-        return self.get('api', 'nba', 'delay', default=1.5)
+        return NBA_DELAY
+
+    @property
+    def nba_burst(self) -> int:
+        return int(self.get('api', 'nba', 'burst', default=3))
 
     @property
     def team_id(self) -> str:
-        return str(self.get('api', 'nba', 'team_id', default="1610612761"))
+        return TEAM_ID
 
     @property
     def refresh_rate(self) -> int:
@@ -103,6 +119,11 @@ class Config:
             'accent': "#A1A1A4"
         })
 
+    @property
+    def chart_max_points(self) -> int:
+        """Get the number of points per trace shown before downsampling"""
+        return self.get('dashboard', 'charts', 'max_points', default=2000)
+
     @property
     def model_features(self) -> list:
         return self.get('ml', 'model', 'features', default=[
@@ -134,3 +155,12 @@ class Config:
     def data_path(self) -> str:
         """Get the path for data storage"""
         return self.get('paths', 'data', default='data')
+
+
+# Parsed once at import and shared read-only by every Config
+_CONFIG = _freeze(_load_yaml_or_default())
+
+TEAM_ID = str(cfg('api', 'nba', 'team_id', default="1610612761"))
+NBA_DELAY = cfg('api', 'nba', 'delay', default=1.5)
+RANDOM_STATE = cfg('ml', 'model', 'training', 'random_state', default=42)
+TEST_SIZE = cfg('ml', 'model', 'training', 'test_size', default=0.2)
@@ -0,0 +1,25 @@
+import fakeredis
+import pytest
+
+from src.data import nba_data
+from src.utils.cache import RedisCache
+from tests.fakes import FakeTeamGameLog
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    """The RedisCache singleton backed by an empty in-process fake Redis"""
+    cache = RedisCache()
+    monkeypatch.setattr(cache, "redis", fakeredis.FakeRedis())
+    cache._memory_cache.clear()
+    return cache
+
+
+@pytest.fixture
+def data_manager(cache, monkeypatch):
+    """A data manager whose team game logs come from FakeTeamGameLog"""
+    monkeypatch.setattr(nba_data.teamgamelog, "TeamGameLog", FakeTeamGameLog)
+    monkeypatch.setattr(FakeTeamGameLog, "rows_by_season", {})
+    manager = nba_data.RaptorsDataManager()
+    manager.api_delay = 0.001
+    return manager
@@ -0,0 +1,20 @@
+GAME_HEADERS = ["Game_ID", "GAME_DATE", "MATCHUP", "WL", "PTS", "FG_PCT", "FG3_PCT", "REB", "AST"]
+
+
+def game_rows(count: int, month: str = "Nov") -> list:
+    """Build teamgamelog rows, newest game first like the API"""
+    return [
+        [f"00224{day:05d}", f"{month} {day:02d}, 2024", "TOR vs. BOS", "W", 100 + day, 0.45, 0.35, 44, 25]
+        for day in range(count, 0, -1)
+    ]
+
+
+class FakeTeamGameLog:
+    """Stand-in for teamgamelog.TeamGameLog serving canned rows per season"""
+    rows_by_season = {}
+
+    def __init__(self, team_id, season):
+        self.season = season
+
+    def get_dict(self):
+        return {"resultSets": [{"headers": GAME_HEADERS, "rowSet": self.rows_by_season.get(self.season, [])}]}
@@ -0,0 +1,50 @@
+import pytest
+import polars as pl
+
+from src.data.nba_data import RaptorsDataManager, _rows_to_polars
+from tests.fakes import FakeTeamGameLog, game_rows
+
+
+def test_rows_to_polars_empty_result_set_has_string_columns():
+    df = _rows_to_polars(["GAME_DATE", "PTS"], [])
+    assert df.height == 0
+    assert df.schema == pl.Schema({"GAME_DATE": pl.String, "PTS": pl.String})
+
+
+def test_get_team_games_empty_season_returns_none(data_manager):
+    FakeTeamGameLog.rows_by_season = {"2024-25": []}
+    assert data_manager.get_team_games("2024-25") is None
+
+
+def test_get_team_games_all_seasons_skips_empty_season(data_manager):
+    FakeTeamGameLog.rows_by_season = {"2023-24": game_rows(3), "2024-25": []}
+    games = data_manager.get_team_games()
+    assert games.height == 3
+    assert games["SEASON"].unique().to_list() == ["2023-24"]
+    assert games.schema["GAME_DATE"] == pl.Date
+
+
+def test_get_team_games_collect_failure_returns_none(data_manager):
+    rows = game_rows(3)
+    for row in rows:
+        row[4] = "not a number"  # PTS fails its Int32 cast when the plan is collected
+    FakeTeamGameLog.rows_by_season = {"2023-24": rows, "2024-25": game_rows(2)}
+    assert data_manager.get_team_games("2023-24") is None
+    assert data_manager.get_team_games() is None
+
+
+def test_season_comparison_served_from_team_games_fetch(data_manager, cache, monkeypatch):
+    FakeTeamGameLog.rows_by_season = {"2023-24": game_rows(3), "2024-25": game_rows(2, month="Dec")}
+    games = data_manager.get_team_games()
+
+    # With the games entry gone, only the aggregate written alongside it can answer without a fetch
+    cache.delete(RaptorsDataManager.get_team_games.cache_key(data_manager))
+    cache._memory_cache.clear()
+    monkeypatch.setattr(FakeTeamGameLog, "get_dict", lambda self: pytest.fail("season comparison refetched games"))
+    comparison = data_manager.get_season_comparison()
+
+    assert comparison["SEASON"].to_list() == ["2024-25", "2023-24"]
+    assert comparison["GAMES_PLAYED"].to_list() == [2, 3]
+    assert comparison["AVG_PTS"].to_list() == [
+        round(games.filter(pl.col("SEASON") == s)["PTS"].mean(), 1) for s in ["2024-25", "2023-24"]
+    ]